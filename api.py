@@ -1,32 +1,87 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Header
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 import os
+import json
+import asyncio
+import uuid
+import hashlib
+import logging
 import tempfile
+from contextlib import asynccontextmanager
 from typing import Optional
 import sys
 
 # Add src directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from Orchestrator import rag_app
+# Orchestrator defers its heavy imports, so importing it here stays cheap
+from Orchestrator import run_analysis, stream_analysis, warm_up, purge_expired_runs, RunInProgressError, RunIdConflictError
+from State import LegalAnalysisResult
+
+async def run_warm_up(app: FastAPI):
+    """Retry warm-up with capped exponential backoff until it succeeds; failures only affect /ready"""
+    delay = 1.0
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            await asyncio.to_thread(warm_up)
+            app.state.ready = True
+            app.state.warm_up_error = None
+            return
+        except Exception as e:
+            app.state.warm_up_error = str(e)
+            logging.error(f"Warm-up attempt {attempt} failed, retrying in {delay:.0f}s: {e}")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, float(os.getenv("WARM_UP_MAX_BACKOFF_SECONDS", "60")))
+
+async def run_checkpoint_purge():
+    """Periodically delete runs older than CHECKPOINT_TTL_SECONDS"""
+    interval = float(os.getenv("CHECKPOINT_PURGE_INTERVAL_SECONDS", "3600"))
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(purge_expired_runs)
+        except Exception as e:
+            logging.error(f"Checkpoint purge failed: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /health answers while the graph compiles
+    app.state.ready = False
+    app.state.warm_up_error = None
+    app.state.warm_up_task = asyncio.create_task(run_warm_up(app))
+    app.state.purge_task = asyncio.create_task(run_checkpoint_purge())
+    yield
+    app.state.warm_up_task.cancel()
+    app.state.purge_task.cancel()
 
 app = FastAPI(
     title="Legal Document Analyzer API",
     description="REST API for analyzing legal documents using AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 class FilePathRequest(BaseModel):
     file_path: str
 
+def get_run_inputs(document_path: str, content: bytes, idempotency_key: Optional[str]) -> tuple:
+    """Build graph inputs and a run id; only requests with an Idempotency-Key can resume or reuse a run"""
+    inputs = {"document_path": document_path, "document_hash": hashlib.sha256(content).hexdigest()}
+    return inputs, idempotency_key or str(uuid.uuid4())
+
 class AnalysisResponse(BaseModel):
-    legal_analysis: str
+    legal_analysis: LegalAnalysisResult
     status: str
     message: str
 
 @app.post("/analyze/file", response_model=AnalysisResponse)
-async def analyze_uploaded_file(file: UploadFile = File(...)):
+async def analyze_uploaded_file(
+    file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     Analyze a legal document by uploading a file.
     Supports .txt, .pdf, .docx files.
@@ -49,8 +104,9 @@ async def analyze_uploaded_file(file: UploadFile = File(...)):
             temp_file_path = temp_file.name
 
         try:
-            # Process the document using the existing orchestrator
-            result = rag_app.invoke({"document_path": temp_file_path})
+            # Process the document, resuming any earlier failed run with the same key
+            inputs, run_id = get_run_inputs(temp_file_path, content, idempotency_key)
+            result = await asyncio.to_thread(run_analysis, inputs, run_id)
 
             return AnalysisResponse(
                 legal_analysis=result["legal_analysis"],
@@ -63,11 +119,18 @@ async def analyze_uploaded_file(file: UploadFile = File(...)):
             if os.path.exists(temp_file_path):
                 os.unlink(temp_file_path)
 
+    except RunInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RunIdConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 @app.post("/analyze/filepath", response_model=AnalysisResponse)
-async def analyze_file_by_path(request: FilePathRequest):
+async def analyze_file_by_path(
+    request: FilePathRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     Analyze a legal document by providing a file path.
     For local demo purposes - accepts file paths on the local system.
@@ -89,8 +152,10 @@ async def analyze_file_by_path(request: FilePathRequest):
                 detail=f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}"
             )
 
-        # Process the document using the existing orchestrator
-        result = rag_app.invoke({"document_path": file_path})
+        # Process the document, resuming any earlier failed run with the same key
+        with open(file_path, 'rb') as f:
+            inputs, run_id = get_run_inputs(file_path, f.read(), idempotency_key)
+        result = await asyncio.to_thread(run_analysis, inputs, run_id)
 
         return AnalysisResponse(
             legal_analysis=result["legal_analysis"],
@@ -100,13 +165,66 @@ async def analyze_file_by_path(request: FilePathRequest):
 
     except HTTPException:
         raise
+    except RunInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RunIdConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+def ndjson_events(analysis):
+    """Serialize analysis events, ending with a done marker or, if the run fails mid-stream, an error record"""
+    try:
+        for event in analysis:
+            yield json.dumps(event) + "\n"
+    except Exception as e:
+        logging.error(f"Streaming analysis failed: {e}")
+        yield json.dumps({"error": f"Error processing file: {str(e)}"}) + "\n"
+        return
+    yield json.dumps({"section": "done"}) + "\n"
+
+@app.post("/analyze/stream")
+async def stream_file_by_path(
+    request: FilePathRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Analyze a legal document by file path, streaming each analysis section
+    as newline-delimited JSON as soon as the model has finished writing it.
+    The stream ends with {"section": "done"} on success or {"error": ...} on failure.
+    """
+    file_path = request.file_path
+
+    # Validate file exists
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
+
+    # Validate file type
+    allowed_extensions = {'.txt', '.pdf', '.docx'}
+    file_extension = os.path.splitext(file_path)[1].lower()
+
+    if file_extension not in allowed_extensions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Allowed types: {', '.join(allowed_extensions)}"
+        )
+
+    with open(file_path, 'rb') as f:
+        inputs, run_id = get_run_inputs(file_path, f.read(), idempotency_key)
+
+    try:
+        analysis = stream_analysis(inputs, run_id)
+    except RunInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except RunIdConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return StreamingResponse(ndjson_events(analysis), media_type="application/x-ndjson")
+
 @app.post("/analyze/combined")
 async def analyze_document(
     file_path: Optional[str] = Form(None),
-    file: Optional[UploadFile] = File(None)
+    file: Optional[UploadFile] = File(None),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     Analyze a legal document by either uploading a file OR providing a file path.
@@ -127,12 +245,12 @@ async def analyze_document(
 
         # Handle file upload
         if file:
-            return await analyze_uploaded_file(file)
+            return await analyze_uploaded_file(file, idempotency_key)
 
         # Handle file path
         if file_path:
             request = FilePathRequest(file_path=file_path)
-            return await analyze_file_by_path(request)
+            return await analyze_file_by_path(request, idempotency_key)
 
     except HTTPException:
         raise
@@ -151,17 +269,39 @@ async def root():
             "/analyze/file": "POST - Upload a file for analysis",
             "/analyze/filepath": "POST - Analyze file by providing local file path",
             "/analyze/combined": "POST - Upload file OR provide file path",
+            "/analyze/stream": "POST - Stream analysis sections for a local file path",
+            "/cache/stats": "GET - Clause cache size and hit rate",
+            "/health": "GET - Liveness check",
+            "/ready": "GET - Readiness check",
             "/docs": "GET - Interactive API documentation"
         }
     }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Clause cache metrics.
+    """
+    from ClauseCache import clause_cache
+    return clause_cache.stats()
+
 @app.get("/health")
 async def health_check():
     """
-    Health check endpoint.
+    Liveness endpoint. Independent of downstream services; see /ready for those.
     """
     return {"status": "healthy", "service": "legal-document-analyzer"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint. Returns 503 until the graph is compiled and clients are warmed up.
+    """
+    if not app.state.ready:
+        detail = f"Warming up, last attempt failed: {app.state.warm_up_error}" if app.state.warm_up_error else "Warming up"
+        raise HTTPException(status_code=503, detail=detail)
+    return {"status": "ready", "service": "legal-document-analyzer"}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
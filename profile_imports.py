@@ -0,0 +1,58 @@
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Lines look like: "import time:       123 |       4567 | package.module"
+IMPORT_TIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str) -> list:
+    """Import module in a fresh interpreter with -X importtime and return (self_us, cumulative_us, depth, name) rows"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            rows.append((int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2, match.group(4)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the API module")
+    parser.add_argument("module", nargs="?", default="api", help="Module to import (default: api)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest direct imports to show")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Exit non-zero if total import time exceeds this")
+    args = parser.parse_args()
+
+    rows = profile_import(args.module)
+    # Children are reported before their parent, so the module's subtree ends at its own row
+    matches = [i for i, row in enumerate(rows) if row[2] == 0 and row[3] == args.module]
+    if not matches:
+        print(f"'{args.module}' was not imported by a fresh interpreter (it is built in or loaded at startup), nothing to profile")
+        sys.exit(2)
+    end = matches[-1]
+    start = max((i for i in range(end) if rows[i][2] == 0), default=-1) + 1
+    total_ms = rows[end][1] / 1000
+    direct = sorted((row for row in rows[start:end] if row[2] == 1), key=lambda row: row[1], reverse=True)
+
+    print(f"Import time for '{args.module}': {total_ms:.1f} ms")
+    print(f"{'cumulative ms':>14}  {'self ms':>9}  module")
+    for self_us, cumulative_us, _, name in direct[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {self_us / 1000:>9.1f}  {name}")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"Import time {total_ms:.1f} ms exceeds budget of {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
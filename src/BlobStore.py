@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+
+class BlobStore:
+    """Content-addressed store for large text payloads kept out of RAGState"""
+
+    def __init__(self, root: str = None, cache_bytes: int = None):
+        self.root = root or os.getenv("BLOB_STORE_DIR", "blobs")
+        os.makedirs(self.root, exist_ok=True)
+        # Byte-bounded LRU of recently read blobs; blobs larger than the budget are never cached
+        self.cache_bytes = cache_bytes if cache_bytes is not None else int(os.getenv("BLOB_CACHE_BYTES", str(16 * 1024 * 1024)))
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, ref: str) -> str:
+        return os.path.join(self.root, ref[:2], ref)
+
+    def put(self, text: str) -> str:
+        """Store text and return its sha256 reference"""
+        data = text.encode("utf-8")
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        if os.path.exists(path):
+            # Refresh the mtime so garbage collection sees the blob as recently used
+            os.utime(path)
+            return ref
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # A unique temp file per writer; concurrent writers of the same content all replace
+        # the target with identical bytes, so whichever lands last is still correct
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return ref
+
+    def get(self, ref: str) -> str:
+        with self._lock:
+            if ref in self._cache:
+                self._cache.move_to_end(ref)
+                return self._cache[ref][0]
+        with open(self._path(ref), "rb") as f:
+            data = f.read()
+        text = data.decode("utf-8")
+        if len(data) <= self.cache_bytes:
+            with self._lock:
+                if ref not in self._cache:
+                    self._cache[ref] = (text, len(data))
+                    self._cached_bytes += len(data)
+                while self._cached_bytes > self.cache_bytes:
+                    _, (_, size) = self._cache.popitem(last=False)
+                    self._cached_bytes -= size
+        return text
+
+    def collect_garbage(self, live_refs: set, grace_seconds: float) -> int:
+        """Delete blobs not in live_refs that have not been written or stored for grace_seconds"""
+        cutoff = time.time() - grace_seconds
+        removed = 0
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name in live_refs:
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    if os.path.getmtime(path) >= cutoff:
+                        continue
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue
+                removed += 1
+                with self._lock:
+                    if name in self._cache:
+                        _, size = self._cache.pop(name)
+                        self._cached_bytes -= size
+        return removed
+
+
+@lru_cache(maxsize=1)
+def get_blob_store() -> BlobStore:
+    """Create the blob store on first use rather than at import"""
+    return BlobStore()
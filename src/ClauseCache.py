@@ -0,0 +1,113 @@
+from collections import OrderedDict
+from typing import Optional, Sequence
+import hashlib
+import logging
+import os
+import re
+import threading
+import numpy as np
+
+
+log = logging.getLogger(__name__)
+
+
+NUMBER_PATTERN = re.compile(
+    r"\d+(?:[.,]\d+)*|\b(?:zero|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve|"
+    r"fifteen|twenty|thirty|forty|fifty|sixty|ninety|hundred|thousand|lakh|crore|half|double|twice)\b",
+    re.IGNORECASE,
+)
+
+
+def clause_key(clause: str) -> str:
+    return hashlib.sha256(clause.encode("utf-8")).hexdigest()
+
+
+def clause_numbers(clause: str) -> tuple:
+    """Numbers in a clause, which embeddings barely distinguish (e.g. a 2 vs a 6 month deposit)"""
+    return tuple(match.lower() for match in NUMBER_PATTERN.findall(clause))
+
+
+class ClauseCache:
+    """In-process vector index of clause findings, keyed on clause embedding and retrieved law ids.
+
+    A lookup hits when a cached clause retrieved the same laws, contains the same numbers
+    and its embedding's cosine similarity is at or above the threshold. Entries are evicted LRU.
+    """
+
+    def __init__(self, capacity: int = None, threshold: float = None):
+        self.capacity = capacity if capacity is not None else int(os.getenv("CLAUSE_CACHE_SIZE", "10000"))
+        self.threshold = threshold if threshold is not None else float(os.getenv("CLAUSE_CACHE_THRESHOLD", "0.95"))
+        self._lock = threading.Lock()
+        # entry id -> (bucket, normalized embedding, findings); a bucket is (law ids, clause numbers)
+        self._entries = OrderedDict()
+        self._buckets = {}
+        # clause key -> normalized embedding of recent misses, so store() rarely needs a re-embed
+        self._pending = OrderedDict()
+        self._next_id = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        vector = np.array(embedding, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        return vector
+
+    def lookup(self, clause: str, embedding: Sequence[float], law_ids: Sequence[int]) -> Optional[dict]:
+        """Return cached findings for a near-duplicate clause that retrieved the same laws"""
+        bucket = (tuple(sorted(law_ids)), clause_numbers(clause))
+        vector = self._normalize(embedding)
+        with self._lock:
+            candidates = list(self._buckets.get(bucket, ()))
+            if candidates:
+                matrix = np.stack([self._entries[entry_id][1] for entry_id in candidates])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    entry_id = candidates[best]
+                    self._entries.move_to_end(entry_id)
+                    self.hits += 1
+                    return dict(self._entries[entry_id][2])
+            self.misses += 1
+            self._pending[clause_key(clause)] = vector
+            while len(self._pending) > self.capacity:
+                self._pending.popitem(last=False)
+            return None
+
+    def pending_embedding(self, clause: str) -> Optional[np.ndarray]:
+        """Embedding of a clause whose lookup missed in this process, if still held"""
+        with self._lock:
+            return self._pending.pop(clause_key(clause), None)
+
+    def store(self, clause: str, embedding: Sequence[float], law_ids: Sequence[int], findings: dict) -> None:
+        """Cache findings for a clause, its embedding and the laws it retrieved"""
+        bucket = (tuple(sorted(law_ids)), clause_numbers(clause))
+        vector = self._normalize(embedding)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (bucket, vector, dict(findings))
+            self._buckets.setdefault(bucket, set()).add(entry_id)
+            while len(self._entries) > self.capacity:
+                old_id, (old_bucket, _, _) = self._entries.popitem(last=False)
+                self._buckets[old_bucket].discard(old_id)
+                if not self._buckets[old_bucket]:
+                    del self._buckets[old_bucket]
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+clause_cache = ClauseCache()
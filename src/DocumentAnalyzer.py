@@ -1,11 +1,14 @@
-from langchain_openai import AzureChatOpenAI
-from langchain_community.document_loaders import UnstructuredWordDocumentLoader
 from langchain_core.prompts import PromptTemplate as LangChainPromptTemplate
 from State import RAGState, LegalDocumentAnalysis
+from BlobStore import get_blob_store
+from functools import lru_cache
 import logging
 import os
 
+@lru_cache(maxsize=1)
 def get_llm_model():
+    """Build the chat client once; it is reused across requests"""
+    from langchain_openai import AzureChatOpenAI
     llm = AzureChatOpenAI(
         model=os.getenv("LLM_MODEL", "gpt-5"),
         azure_deployment=os.getenv("LLM_DEPLOYMENT", "gpt-5"),
@@ -18,6 +21,8 @@ def get_llm_model():
         
 def load_document(file_path: str) -> str:
     """Load and extract text from DOCX file"""
+    # unstructured is slow to import, so only load it when a document is parsed
+    from langchain_community.document_loaders import UnstructuredWordDocumentLoader
     loader = UnstructuredWordDocumentLoader(file_path)
     documents = loader.load()
     return documents[0].page_content if documents else ""
@@ -49,10 +54,11 @@ def analyze_document(state : RAGState) -> RAGState:
     """Analyze the legal document and return structured results"""
     # Load document content
     document_text = load_document(state["document_path"])
-    state["document"] = document_text
     
     if not document_text:
         raise ValueError("Could not extract text from the document")
+
+    state["document_ref"] = get_blob_store().put(document_text)
     
     # Create prompt
     prompt = create_prompt()
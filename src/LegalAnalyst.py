@@ -1,11 +1,19 @@
 from langchain_core.prompts import PromptTemplate as LangChainPromptTemplate
-from langchain_openai import AzureChatOpenAI
-from State import RAGState
+from langchain_core.output_parsers import JsonOutputParser
+from langgraph.config import get_stream_writer
+from State import RAGState, LegalAnalysisResult, ClauseFindings
+from BlobStore import get_blob_store
+from ClauseCache import clause_cache
+from typing import Iterator, Tuple
+from functools import lru_cache
 import os
 import logging
 
 
+@lru_cache(maxsize=1)
 def get_llm_model():
+    """Build the chat client once; it is reused across requests"""
+    from langchain_openai import AzureChatOpenAI
     llm = AzureChatOpenAI(
         model=os.getenv("LLM_MODEL", "gpt-5"),
         azure_deployment=os.getenv("LLM_DEPLOYMENT", "gpt-5"),
@@ -17,39 +25,141 @@ def get_llm_model():
     return llm
 
 
+def get_response_format() -> dict:
+    """Strict JSON schema response format so the model can only return a valid LegalAnalysisResult"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": LegalAnalysisResult.__name__,
+            "schema": LegalAnalysisResult.model_json_schema(),
+            "strict": True,
+        },
+    }
+
+
+def stream_sections(llm_chain, inputs: dict) -> Iterator[Tuple[str, object]]:
+    """Yield (section, value) pairs as each section of the streamed JSON completes"""
+    partial = {}
+    emitted = 0
+    for partial in llm_chain.stream(inputs):
+        keys = list(partial)
+        # Every key before the one currently being written is complete
+        while emitted < len(keys) - 1:
+            yield keys[emitted], partial[keys[emitted]]
+            emitted += 1
+    for key in list(partial)[emitted:]:
+        yield key, partial[key]
+
+
+def merge_clause_findings(new_findings: list, cached_findings: list, novel_indexes) -> list:
+    """Combine the model's findings for novel clauses with findings reused from the clause cache"""
+    findings = [ClauseFindings.model_validate(f) for f in new_findings]
+    findings = [f for f in findings if f.clause_index in novel_indexes]
+    findings += [ClauseFindings.model_validate(f) for f in cached_findings]
+    return sorted(findings, key=lambda f: f.clause_index)
+
+
+CLAUSE_SECTIONS = ("corrections", "compliance", "risks", "recommendations")
+
+
+def merge_cached_section(section: str, value: list, cached_findings: list) -> list:
+    """Add cached clause findings to a top-level section the model wrote for novel clauses only"""
+    merged = list(value)
+    for findings in cached_findings:
+        merged += [item for item in findings[section] if item not in merged]
+    return merged
+
+
+def cache_clause_findings(important_clauses: list, retrieved_laws: list, new_findings: list) -> None:
+    """Store findings for newly reviewed clauses, re-embedding any whose lookup ran in another process"""
+    law_ids = {}
+    for law in retrieved_laws:
+        law_ids.setdefault(law["clause_index"], []).append(law["id"])
+    embeddings = {
+        findings.clause_index: clause_cache.pending_embedding(important_clauses[findings.clause_index])
+        for findings in new_findings
+    }
+    missing = [clause_index for clause_index, embedding in embeddings.items() if embedding is None]
+    if missing:
+        from Retriever import get_embed_model
+        vectors = get_embed_model().embed_documents([important_clauses[clause_index] for clause_index in missing])
+        embeddings.update(zip(missing, vectors))
+    for findings in new_findings:
+        clause_cache.store(
+            important_clauses[findings.clause_index],
+            embeddings[findings.clause_index],
+            law_ids.get(findings.clause_index, []),
+            findings.model_dump(exclude={"clause_index"}),
+        )
+
+
 def legal_analysis(state : RAGState) -> RAGState:
     prompt = """
     You are a legal Analyst reviewing a document looking for omissions/corrections required. 
-    Inputs are the document and a list of context documents from Government Acts and Laws.
-    original document: {original_document}
-    clauses from Government Acts and Laws: {clauses}
-
-    Please analyze the document and provide the following information:
-    - Omissions: Any missing information or clauses that should be included
-    - Corrections: Any incorrect or misleading information that needs to be revised
-    - Compliance: Any sections that do not comply with the law
-    - Risks: Any potential risks or liabilities in the document
-    - Recommendations: Any suggestions for improving the document
+    Inputs are the document, its important clauses, and the clauses under review with their matching clauses from Government Acts and Laws.
+    When some clauses have already been reviewed, only a summary of the document is given instead of its full text.
+    document: {document}
+    important clauses in the document: {important_clauses}
+    clauses under review, with clauses from Government Acts and Laws: {clauses}
+    {reviewed_count} other clauses were reviewed separately; their findings are merged into your answer afterwards.
+
+    Please analyze the clauses under review and provide the following information:
+    - Omissions: Any missing information or clauses that should be included in the document
+    - Corrections: Any incorrect or misleading information in the clauses under review that needs to be revised
+    - Compliance: Any clauses under review that do not comply with the law
+    - Risks: Any potential risks or liabilities in the clauses under review
+    - Recommendations: Any suggestions for improving the clauses under review
+    - Clause Findings: Corrections, compliance issues, risks and recommendations for each clause under review.
+      These are reused for the same clause in other documents, so write them generically: never mention party names,
+      amounts, dates, addresses or any other detail specific to this document.
     - Executive Summary: A brief summary of the document analysis
-    
-    Return a structured JSON object with the following format:
-    {{
-        "omissions": ["Missing clause X"],
-        "corrections": ["Correct clause Y"],
-        "compliance": ["Non-compliant section Z"],
-        "risks": ["Risk of ABC"],
-        "recommendations": ["Include clause A"],
-        "executive_summary": "The document is mostly compliant with the law, but there are several areas that need attention."
-    }}
 
     """
     prompt_template = LangChainPromptTemplate.from_template(prompt)
-    llm = get_llm_model()
+    llm = get_llm_model().bind(response_format=get_response_format())
     logging.info("Invoking LLM model for legal analysis...")
-    llm_chain = prompt_template | llm
-    original_document = state["document"]
-    clauses = state["retrieved_laws"]
-    response = llm_chain.invoke({"original_document": original_document, "clauses": clauses})
+    llm_chain = prompt_template | llm | JsonOutputParser()
+    document_report = state["document_report"]
+    important_clauses = document_report.important_clauses
+    cached_findings = state.get("cached_findings", [])
+    cached_indexes = {findings["clause_index"] for findings in cached_findings}
+
+    # Only clauses without cached findings are sent for review, and once any clause is cached the
+    # full text is replaced by the document summary so a cache hit actually shrinks the prompt
+    if cached_findings:
+        document = document_report.model_dump_json(exclude={"important_clauses"})
+    else:
+        document = get_blob_store().get(state["document_ref"])
+    clauses = {
+        clause_index: {"clause_index": clause_index, "clause": clause, "laws": []}
+        for clause_index, clause in enumerate(important_clauses)
+        if clause_index not in cached_indexes
+    }
+    for law in state["retrieved_laws"]:
+        if law["clause_index"] in clauses:
+            clauses[law["clause_index"]]["laws"].append({"text": get_blob_store().get(law["text_ref"]), "source": law["source"]})
+    logging.info(f"Reviewing {len(clauses)} novel clauses, {len(cached_indexes)} served from cache")
+
+    writer = get_stream_writer()
+    sections = {}
+    inputs = {
+        "document": document,
+        "important_clauses": important_clauses,
+        "clauses": list(clauses.values()),
+        "reviewed_count": len(cached_indexes),
+    }
+    for section, value in stream_sections(llm_chain, inputs):
+        # Stream the same merged sections that end up in the checkpointed result
+        if section == "clause_findings":
+            value = [f.model_dump() for f in merge_clause_findings(value, cached_findings, clauses)]
+        elif section in CLAUSE_SECTIONS:
+            value = merge_cached_section(section, value, cached_findings)
+        writer({"section": section, "value": value})
+        sections[section] = value
     logging.info("LLM model invocation complete")
-    state["legal_analysis"] = response.content
+    result = LegalAnalysisResult.model_validate(sections)
+
+    new_findings = [findings for findings in result.clause_findings if findings.clause_index in clauses]
+    cache_clause_findings(important_clauses, state["retrieved_laws"], new_findings)
+    state["legal_analysis"] = result
     return state
@@ -1,24 +1,189 @@
-from langgraph.graph import StateGraph, END
-from DocumentAnalyzer import analyze_document
-from Retriever import retriever
-from LegalAnalyst import legal_analysis
 from State import RAGState
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Iterator, Optional
+import sqlite3
 import logging
+import os
+import threading
 
 
-graph = StateGraph(RAGState)
+class RunInProgressError(RuntimeError):
+    """Raised when a run with the same run id is already executing in this process"""
 
-graph.add_node("DocumentAnalyzer", analyze_document)
-graph.add_node("Retriever", retriever)
-graph.add_node("LegalAnalyst", legal_analysis)
 
-graph.add_edge("DocumentAnalyzer", "Retriever")
-graph.add_edge("Retriever", "LegalAnalyst")
-graph.add_edge("LegalAnalyst", END)
+class RunIdConflictError(ValueError):
+    """Raised when a run id is reused for a different document"""
 
-graph.set_entry_point("DocumentAnalyzer")
 
+_in_flight = set()
+_in_flight_lock = threading.Lock()
 
-# Compile app
-logging.info("Compiling RAG App...")
-rag_app = graph.compile()
\ No newline at end of file
+
+def build_graph():
+    from langgraph.graph import StateGraph, END
+    from DocumentAnalyzer import analyze_document
+    from Retriever import retriever
+    from LegalAnalyst import legal_analysis
+
+    graph = StateGraph(RAGState)
+
+    graph.add_node("DocumentAnalyzer", analyze_document)
+    graph.add_node("Retriever", retriever)
+    graph.add_node("LegalAnalyst", legal_analysis)
+
+    graph.add_edge("DocumentAnalyzer", "Retriever")
+    graph.add_edge("Retriever", "LegalAnalyst")
+    graph.add_edge("LegalAnalyst", END)
+
+    graph.set_entry_point("DocumentAnalyzer")
+    return graph
+
+
+def get_checkpointer():
+    """Create a SQLite checkpointer so completed nodes survive a failed run"""
+    from langgraph.checkpoint.sqlite import SqliteSaver
+    conn = sqlite3.connect(os.getenv("CHECKPOINT_DB", "checkpoints.sqlite"), check_same_thread=False)
+    return SqliteSaver(conn)
+
+
+@lru_cache(maxsize=1)
+def get_rag_app():
+    """Compile the RAG App on first use"""
+    logging.info("Compiling RAG App...")
+    return build_graph().compile(checkpointer=get_checkpointer())
+
+
+def warm_up() -> None:
+    """Compile the graph and open upstream clients ahead of the first request"""
+    from Retriever import get_collection, get_embed_model
+    import DocumentAnalyzer
+    import LegalAnalyst
+    get_rag_app()
+    get_collection()
+    get_embed_model()
+    DocumentAnalyzer.get_llm_model()
+    LegalAnalyst.get_llm_model()
+    logging.info("RAG App ready")
+
+
+def _acquire_run(run_id: str) -> None:
+    with _in_flight_lock:
+        if run_id in _in_flight:
+            raise RunInProgressError(f"Run {run_id} is already in progress")
+        _in_flight.add(run_id)
+
+
+def _release_run(run_id: str) -> None:
+    with _in_flight_lock:
+        _in_flight.discard(run_id)
+
+
+def _checkpoint_ttl() -> float:
+    return float(os.getenv("CHECKPOINT_TTL_SECONDS", "604800"))
+
+
+def _get_snapshot(config: dict, inputs: dict, run_id: str):
+    """Return the run's latest checkpoint, discarding it once older than CHECKPOINT_TTL_SECONDS"""
+    app = get_rag_app()
+    snapshot = app.get_state(config)
+    if snapshot.created_at:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(snapshot.created_at)
+        if age.total_seconds() > _checkpoint_ttl():
+            logging.info(f"Checkpoint for run {run_id} expired, starting over")
+            app.checkpointer.delete_thread(run_id)
+            snapshot = app.get_state(config)
+    # A run id only ever belongs to one document, so a reused key can't return another document's analysis
+    if snapshot.values and snapshot.values.get("document_hash") != inputs.get("document_hash"):
+        raise RunIdConflictError(f"Run {run_id} was started for a different document")
+    return snapshot
+
+
+def _blob_refs(values: dict) -> set:
+    refs = {law["text_ref"] for law in values.get("retrieved_laws") or []}
+    if values.get("document_ref"):
+        refs.add(values["document_ref"])
+    return refs
+
+
+def purge_expired_runs() -> int:
+    """Delete runs whose latest checkpoint is older than CHECKPOINT_TTL_SECONDS, returning how many.
+
+    Blobs no longer referenced by any remaining checkpoint are then garbage collected, sparing
+    those touched within BLOB_GC_GRACE_SECONDS so in-flight runs keep theirs.
+    """
+    from BlobStore import get_blob_store
+    checkpointer = get_rag_app().checkpointer
+    latest = {}
+    refs = {}
+    for checkpoint_tuple in checkpointer.list(None):
+        thread_id = checkpoint_tuple.config["configurable"]["thread_id"]
+        ts = datetime.fromisoformat(checkpoint_tuple.checkpoint["ts"])
+        latest[thread_id] = max(latest.get(thread_id, ts), ts)
+        refs.setdefault(thread_id, set()).update(_blob_refs(checkpoint_tuple.checkpoint["channel_values"]))
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=_checkpoint_ttl())
+    with _in_flight_lock:
+        expired = [thread_id for thread_id, ts in latest.items() if ts < cutoff and thread_id not in _in_flight]
+    for thread_id in expired:
+        checkpointer.delete_thread(thread_id)
+        del refs[thread_id]
+    live_refs = set().union(*refs.values())
+    removed = get_blob_store().collect_garbage(live_refs, float(os.getenv("BLOB_GC_GRACE_SECONDS", "3600")))
+    if expired or removed:
+        logging.info(f"Purged {len(expired)} expired runs and {removed} unreferenced blobs")
+    return len(expired)
+
+
+def _is_complete(snapshot) -> bool:
+    return not snapshot.next and bool(snapshot.values.get("legal_analysis"))
+
+
+def _resume_inputs(snapshot, inputs: dict, run_id: str) -> Optional[dict]:
+    """Return None to resume an interrupted run, otherwise the fresh inputs"""
+    # The document may only be readable from the new inputs (e.g. a fresh upload), so a run
+    # that failed before DocumentAnalyzer finished starts over instead of resuming
+    if snapshot.next and "DocumentAnalyzer" not in snapshot.next:
+        logging.info(f"Resuming run {run_id} at {snapshot.next}")
+        return None
+    return inputs
+
+
+def run_analysis(inputs: dict, run_id: str) -> RAGState:
+    """Run the graph under run_id, resuming from the last completed node if a previous attempt failed"""
+    config = {"configurable": {"thread_id": run_id}}
+    _acquire_run(run_id)
+    try:
+        snapshot = _get_snapshot(config, inputs, run_id)
+        if _is_complete(snapshot):
+            logging.info(f"Run {run_id} already complete, returning checkpointed result")
+            return snapshot.values
+        return get_rag_app().invoke(_resume_inputs(snapshot, inputs, run_id), config)
+    finally:
+        _release_run(run_id)
+
+
+def stream_analysis(inputs: dict, run_id: str) -> Iterator[dict]:
+    """Like run_analysis, but yield each LegalAnalyst section as soon as it is complete.
+
+    The run is claimed and checked immediately, so a duplicate or conflicting run id fails
+    before any response is sent.
+    """
+    config = {"configurable": {"thread_id": run_id}}
+    _acquire_run(run_id)
+    try:
+        snapshot = _get_snapshot(config, inputs, run_id)
+    except BaseException:
+        _release_run(run_id)
+        raise
+    return _stream_claimed_run(snapshot, config, inputs, run_id)
+
+
+def _stream_claimed_run(snapshot, config: dict, inputs: dict, run_id: str) -> Iterator[dict]:
+    try:
+        if _is_complete(snapshot):
+            for section, value in snapshot.values["legal_analysis"].model_dump().items():
+                yield {"section": section, "value": value}
+            return
+        yield from get_rag_app().stream(_resume_inputs(snapshot, inputs, run_id), config, stream_mode="custom")
+    finally:
+        _release_run(run_id)
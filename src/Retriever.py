@@ -1,7 +1,8 @@
 import logging
-from pymilvus import connections, Collection
-from langchain_openai import AzureOpenAIEmbeddings
+from functools import lru_cache
 from State import RAGState
+from BlobStore import get_blob_store
+from ClauseCache import clause_cache
 import os
 
 
@@ -9,7 +10,10 @@ log = logging.getLogger(__name__)
 
 
 
+@lru_cache(maxsize=1)
 def get_embed_model():
+    """Build the embeddings client once; it is reused across requests"""
+    from langchain_openai import AzureOpenAIEmbeddings
     embeddings = AzureOpenAIEmbeddings(
             azure_deployment=os.getenv("EMBED_DEPLOYMENT", "text-embedding-3-large"),
             model=os.getenv("EMBED_MODEL", "text-embedding-3-large"),
@@ -20,20 +24,28 @@ def get_embed_model():
     return embeddings
 
 
+@lru_cache(maxsize=1)
+def get_collection():
+    """Connect to Milvus once and load the legal documents collection"""
+    from pymilvus import connections, Collection
+    connections.connect("default", uri=os.getenv("MIVLUS_URL"), user=os.getenv("MILVUS_USER"), password=os.getenv("MILVUS_PASSWORD"))
+    collection = Collection("legal_documents")
+    collection.load()
+    return collection
+
+
 def retriever(state: RAGState) -> RAGState:
     try:
-        # Connect to Milvus
-        connections.connect("default", uri=os.getenv("MIVLUS_URL"), user=os.getenv("MILVUS_USER"), password=os.getenv("MILVUS_PASSWORD"))
-        collection = Collection("legal_documents")
-        collection.load()
+        collection = get_collection()
 
         final_results=  []
+        cached_findings = []
         embed_model=get_embed_model()
         log.info("Retrieving similar documents...")
         
         clauses= state["document_report"].important_clauses
         # Query for similar documents
-        for clause in clauses:
+        for clause_index, clause in enumerate(clauses):
             query_embedding = embed_model.embed_query(clause)
             results = collection.search(
                 data=[query_embedding],
@@ -47,12 +59,20 @@ def retriever(state: RAGState) -> RAGState:
             for hits in results:
                 for hit in hits:
                     formatted_results.append({
-                        "text": hit['entity'].get("text", "N/A"),
+                        "id": hit['id'],
+                        "clause_index": clause_index,
+                        "text_ref": get_blob_store().put(hit['entity'].get("text", "N/A")),
                         "source": hit['entity'].get("source", "N/A")
                     })
             final_results.extend(formatted_results)
+            # Reuse findings from a near-duplicate clause that matched the same laws
+            findings = clause_cache.lookup(clause, query_embedding, [law["id"] for law in formatted_results])
+            if findings is not None:
+                cached_findings.append({**findings, "clause_index": clause_index})
         state["retrieved_laws"] = final_results
+        state["cached_findings"] = cached_findings
         log.info(f"Retrieved {len(final_results)} similar documents")
+        log.info(f"Reused cached findings for {len(cached_findings)}/{len(clauses)} clauses")
         return state
     except Exception as e:
         log.error(f"Error in retriever: {e}")
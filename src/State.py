@@ -1,6 +1,5 @@
-from typing import Dict
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, TypedDict
+from pydantic import BaseModel, ConfigDict, Field
 
 class PartyRole(BaseModel):
     name: str = Field(description="Name of the party")
@@ -16,9 +15,41 @@ class LegalDocumentAnalysis(BaseModel):
     important_clauses: List[str] = Field(description="List of important clauses or provisions in the document")
 
 
-class RAGState(Dict):
+class ClauseFindings(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    clause_index: int = Field(description="Index of the clause in the document's important clauses")
+    corrections: List[str] = Field(description="Corrections required in this clause")
+    compliance: List[str] = Field(description="Ways in which this clause does not comply with the law")
+    risks: List[str] = Field(description="Risks or liabilities arising from this clause")
+    recommendations: List[str] = Field(description="Suggestions for improving this clause")
+
+
+class LegalAnalysisResult(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    omissions: List[str] = Field(description="Missing information or clauses that should be included")
+    corrections: List[str] = Field(description="Incorrect or misleading information that needs to be revised")
+    compliance: List[str] = Field(description="Sections that do not comply with the law")
+    risks: List[str] = Field(description="Potential risks or liabilities in the document")
+    recommendations: List[str] = Field(description="Suggestions for improving the document")
+    clause_findings: List[ClauseFindings] = Field(description="Findings for each clause under review")
+    executive_summary: str = Field(description="A brief summary of the document analysis")
+
+
+class RetrievedLaw(TypedDict):
+    id: int
+    clause_index: int
+    text_ref: str
+    source: str
+
+
+class RAGState(TypedDict, total=False):
     document_path: str
-    document: str
-    document_report:LegalDocumentAnalysis
-    retrieved_laws: dict
-    legal_analysis: dict
+    document_hash: str
+    document_ref: str
+    document_report: LegalDocumentAnalysis
+    retrieved_laws: List[RetrievedLaw]
+    cached_findings: List[dict]  # ClauseFindings dumps reused from the clause cache
+    legal_analysis: LegalAnalysisResult
+
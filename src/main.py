@@ -1,10 +1,11 @@
-from Orchestrator import rag_app
+from Orchestrator import run_analysis
 import logging
+import uuid
 
 if __name__ == "__main__":
     document_path = "C:\\Users\\aiyermab\\Documents\\Mock Legal Documents\\Rental Agreement With Errors.docx"
 
     logging.info("Invoking Agents...")
-    result = rag_app.invoke({"document_path": document_path})
+    result = run_analysis({"document_path": document_path}, run_id=str(uuid.uuid4()))
     logging.info("Agents invoked successfully")
-    print(result["legal_analysis"])
\ No newline at end of file
+    print(result["legal_analysis"].model_dump_json(indent=2))
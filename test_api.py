@@ -1,6 +1,7 @@
 import requests
 import json
 import os
+import time
 
 # API base URL
 BASE_URL = "http://localhost:8000"
@@ -24,7 +25,7 @@ def test_file_path_analysis():
         print("✅ File Path Analysis Successful!")
         print(f"Status: {result['status']}")
         print(f"Message: {result['message']}")
-        print(f"Legal Analysis:\n{result['legal_analysis']}")
+        print(f"Legal Analysis:\n{json.dumps(result['legal_analysis'], indent=2)}")
     else:
         print(f"❌ Error: {response.status_code}")
         print(response.text)
@@ -47,7 +48,7 @@ def test_file_upload_analysis():
                 print("✅ File Upload Analysis Successful!")
                 print(f"Status: {result['status']}")
                 print(f"Message: {result['message']}")
-                print(f"Legal Analysis:\n{result['legal_analysis']}")
+                print(f"Legal Analysis:\n{json.dumps(result['legal_analysis'], indent=2)}")
             else:
                 print(f"❌ Error: {response.status_code}")
                 print(response.text)
@@ -73,7 +74,7 @@ def test_combined_endpoint_with_path():
         print("✅ Combined Endpoint (File Path) Analysis Successful!")
         print(f"Status: {result['status']}")
         print(f"Message: {result['message']}")
-        print(f"Legal Analysis:\n{result['legal_analysis']}")
+        print(f"Legal Analysis:\n{json.dumps(result['legal_analysis'], indent=2)}")
     else:
         print(f"❌ Error: {response.status_code}")
         print(response.text)
@@ -92,11 +93,23 @@ def check_api_health():
         print("❌ Cannot connect to API. Make sure the server is running!")
         return False
 
+def wait_for_api_ready(timeout: int = 120):
+    """Wait until the API has finished warming up"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = requests.get(f"{BASE_URL}/ready")
+        if response.status_code == 200:
+            print("✅ API is ready!")
+            return True
+        time.sleep(2)
+    print(f"❌ API not ready after {timeout}s: {response.text}")
+    return False
+
 if __name__ == "__main__":
     print("🧪 Testing Legal Document Analyzer API\n")
 
     # Check if API is running
-    if check_api_health():
+    if check_api_health() and wait_for_api_ready():
         print("\n" + "="*50)
 
         # Test file path analysis
@@ -0,0 +1,82 @@
+import os
+import sys
+import threading
+import time
+
+# Add src directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from BlobStore import BlobStore
+
+
+def test_put_and_get_round_trip(tmp_path):
+    store = BlobStore(root=str(tmp_path))
+    ref = store.put("Section 7: security deposit")
+
+    assert store.put("Section 7: security deposit") == ref
+    assert store.get(ref) == "Section 7: security deposit"
+
+
+def test_concurrent_puts_of_same_content(tmp_path):
+    store = BlobStore(root=str(tmp_path))
+    clause = "standard notice period clause " * 20000
+    errors = []
+
+    def put():
+        barrier.wait()
+        try:
+            store.put(clause)
+        except Exception as e:
+            errors.append(e)
+
+    for _ in range(50):
+        barrier = threading.Barrier(8)
+        threads = [threading.Thread(target=put) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for root, _, files in os.walk(tmp_path):
+            for name in files:
+                if name.endswith(".tmp"):
+                    errors.append(f"leftover {name}")
+        # Remove the blob so the next round races on the write again
+        os.unlink(store._path(store.put(clause)))
+
+    assert errors == []
+
+
+def test_read_cache_is_bounded_by_bytes(tmp_path):
+    store = BlobStore(root=str(tmp_path), cache_bytes=10)
+    small = store.put("12345")
+    other = store.put("67890")
+    large = store.put("x" * 11)
+
+    store.get(small)
+    store.get(other)
+    store.get(large)
+    assert list(store._cache) == [small, other]
+
+    store.get(store.put("abcde"))
+    assert list(store._cache) == [other, store.put("abcde")]
+    assert store._cached_bytes == 10
+
+
+def test_garbage_collection_keeps_live_and_recent_blobs(tmp_path):
+    store = BlobStore(root=str(tmp_path))
+    live = store.put("live clause")
+    dead = store.put("expired document")
+    recent = store.put("in-flight document")
+    old = time.time() - 7200
+    for ref in (live, dead, recent):
+        os.utime(store._path(ref), (old, old))
+    store.get(dead)
+
+    # Storing existing content again refreshes its mtime
+    store.put("in-flight document")
+
+    assert store.collect_garbage({live}, grace_seconds=3600) == 1
+    assert not os.path.exists(store._path(dead))
+    assert dead not in store._cache
+    assert store.get(live) == "live clause"
+    assert store.get(recent) == "in-flight document"
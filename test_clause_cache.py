@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+
+# Add src directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault("BLOB_STORE_DIR", tempfile.mkdtemp())
+
+import LegalAnalyst
+import Retriever
+from ClauseCache import ClauseCache
+from State import ClauseFindings
+
+FINDINGS = {"corrections": [], "compliance": ["Deposit exceeds two months' rent"], "risks": [], "recommendations": []}
+
+
+def test_hit_for_same_clause_and_laws():
+    cache = ClauseCache(capacity=10, threshold=0.95)
+    assert cache.lookup("deposit", [1.0, 0.0], [7, 3]) is None
+    cache.store("deposit", [1.0, 0.0], [3, 7], FINDINGS)
+
+    assert cache.lookup("deposit", [2.0, 0.0], [3, 7]) == FINDINGS
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_miss_when_retrieved_laws_differ():
+    cache = ClauseCache(capacity=10, threshold=0.95)
+    cache.store("deposit", [1.0, 0.0], [3], FINDINGS)
+
+    assert cache.lookup("deposit", [1.0, 0.0], [4]) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_near_duplicate_respects_threshold():
+    cache = ClauseCache(capacity=10, threshold=0.95)
+    cache.store("deposit", [1.0, 0.0], [3], FINDINGS)
+
+    # cosine 0.99 is a near duplicate, cosine 0.8 is not
+    assert cache.lookup("deposit", [0.99, 0.141], [3]) == FINDINGS
+    assert cache.lookup("notice", [0.8, 0.6], [3]) is None
+
+
+def test_number_only_change_is_a_miss():
+    cache = ClauseCache(capacity=10, threshold=0.95)
+    cache.store("Tenant shall pay a deposit of 2 months' rent", [1.0, 0.0], [3], FINDINGS)
+
+    # Identical embeddings and laws, but a different amount must not reuse the compliance finding
+    assert cache.lookup("Tenant shall pay a deposit of 6 months' rent", [1.0, 0.0], [3]) is None
+    assert cache.lookup("Tenant shall pay a deposit of two months' rent", [1.0, 0.0], [3]) is None
+    assert cache.lookup("The tenant shall pay a deposit of 2 months' rent", [1.0, 0.0], [3]) == FINDINGS
+
+
+def test_explicit_zero_threshold_is_kept():
+    cache = ClauseCache(capacity=10, threshold=0)
+    cache.store("deposit", [1.0, 0.0], [3], FINDINGS)
+
+    assert cache.threshold == 0
+    assert cache.lookup("notice", [0.1, 1.0], [3]) == FINDINGS
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ClauseCache(capacity=2, threshold=0.95)
+    cache.store("a", [1.0, 0.0], [1], {"clause": "a"})
+    cache.store("b", [1.0, 0.0], [2], {"clause": "b"})
+    cache.lookup("a", [1.0, 0.0], [1])
+    cache.store("c", [1.0, 0.0], [3], {"clause": "c"})
+
+    assert cache.lookup("b", [1.0, 0.0], [2]) is None
+    assert cache.lookup("a", [1.0, 0.0], [1]) == {"clause": "a"}
+    assert cache.lookup("c", [1.0, 0.0], [3]) == {"clause": "c"}
+    assert cache.stats()["size"] == 2
+    assert cache.stats()["evictions"] == 1
+
+
+def test_findings_are_cached_when_lookup_ran_in_another_process(monkeypatch):
+    cache = ClauseCache(capacity=10, threshold=0.95)
+    monkeypatch.setattr(LegalAnalyst, "clause_cache", cache)
+
+    class FakeEmbeddings:
+        def embed_documents(self, texts):
+            return [[1.0, 0.0] for _ in texts]
+
+    monkeypatch.setattr(Retriever, "get_embed_model", lambda: FakeEmbeddings())
+    LegalAnalyst.cache_clause_findings(
+        ["deposit"],
+        [{"id": 3, "clause_index": 0, "text_ref": "", "source": "act"}],
+        [ClauseFindings(clause_index=0, **FINDINGS)],
+    )
+
+    assert cache.lookup("deposit", [1.0, 0.0], [3]) == FINDINGS
+
+
+def test_merged_findings_include_cached_clauses():
+    merged = LegalAnalyst.merge_clause_findings(
+        [{"clause_index": 1, **FINDINGS}, {"clause_index": 0, **FINDINGS}],
+        [{"clause_index": 0, **FINDINGS, "risks": ["cached"]}],
+        novel_indexes={1},
+    )
+
+    assert [(f.clause_index, f.risks) for f in merged] == [(0, ["cached"]), (1, [])]
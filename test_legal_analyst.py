@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+
+# Add src directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault("BLOB_STORE_DIR", tempfile.mkdtemp())
+
+import LegalAnalyst
+
+
+class FakeChain:
+    """Stands in for prompt | llm | JsonOutputParser, yielding cumulative partial dicts"""
+
+    def __init__(self, partials, seen):
+        self.partials = partials
+        self.seen = seen
+
+    def stream(self, inputs):
+        for partial in self.partials:
+            self.seen.append(dict(partial))
+            yield partial
+
+
+def test_stream_sections_emits_each_section_once_after_the_next_key_appears():
+    partials = [
+        {"omissions": []},
+        {"omissions": ["Missing notice clause"]},
+        {"omissions": ["Missing notice clause"], "corrections": []},
+        {"omissions": ["Missing notice clause"], "corrections": ["Fix rent"]},
+        {"omissions": ["Missing notice clause"], "corrections": ["Fix rent"], "executive_summary": "Mostly"},
+        {"omissions": ["Missing notice clause"], "corrections": ["Fix rent"], "executive_summary": "Mostly compliant"},
+    ]
+    seen = []
+    emitted = []
+    for section, value in LegalAnalyst.stream_sections(FakeChain(partials, seen), {}):
+        emitted.append((section, value, len(seen)))
+
+    assert emitted == [
+        # omissions is only complete once corrections starts (third partial)
+        ("omissions", ["Missing notice clause"], 3),
+        ("corrections", ["Fix rent"], 5),
+        # the last section is emitted when the stream ends
+        ("executive_summary", "Mostly compliant", 6),
+    ]
+
+
+def test_stream_sections_with_no_output():
+    assert list(LegalAnalyst.stream_sections(FakeChain([], []), {})) == []
+
+
+def test_cached_clauses_are_left_out_of_the_prompt_and_merged_back(monkeypatch, tmp_path):
+    import json
+    from langchain_core.runnables import RunnableLambda
+    from BlobStore import BlobStore
+    from ClauseCache import ClauseCache
+    from State import LegalDocumentAnalysis
+
+    store = BlobStore(root=str(tmp_path))
+    prompts = []
+    answer = {
+        "omissions": ["No notice period"],
+        "corrections": [],
+        "compliance": [],
+        "risks": ["Novel risk"],
+        "recommendations": [],
+        "clause_findings": [{"clause_index": 1, "corrections": [], "compliance": [], "risks": ["Novel risk"], "recommendations": []}],
+        "executive_summary": "Needs work",
+    }
+
+    class FakeLLM:
+        def bind(self, **kwargs):
+            return RunnableLambda(lambda prompt: prompts.append(prompt.to_string()) or json.dumps(answer))
+
+    monkeypatch.setattr(LegalAnalyst, "get_llm_model", lambda: FakeLLM())
+    monkeypatch.setattr(LegalAnalyst, "get_blob_store", lambda: store)
+    monkeypatch.setattr(LegalAnalyst, "get_stream_writer", lambda: (lambda event: None))
+    monkeypatch.setattr(LegalAnalyst, "clause_cache", ClauseCache(capacity=10, threshold=0.95))
+    monkeypatch.setattr(LegalAnalyst.clause_cache, "pending_embedding", lambda clause: [1.0, 0.0])
+
+    cached = {"clause_index": 0, "corrections": [], "compliance": ["Deposit cap exceeded"], "risks": [], "recommendations": []}
+    state = LegalAnalyst.legal_analysis({
+        "document_ref": store.put("FULL DOCUMENT TEXT"),
+        "document_report": LegalDocumentAnalysis(
+            purpose="Lease", parties_involved=[], date=None, city=None, state=None, country=None,
+            important_clauses=["Deposit of two months' rent", "Tenant bears all repairs"],
+        ),
+        "retrieved_laws": [
+            {"id": 1, "clause_index": 0, "text_ref": store.put("DEPOSIT STATUTE"), "source": "act"},
+            {"id": 2, "clause_index": 1, "text_ref": store.put("REPAIR STATUTE"), "source": "act"},
+        ],
+        "cached_findings": [cached],
+    })
+
+    assert "FULL DOCUMENT TEXT" not in prompts[0]
+    assert "DEPOSIT STATUTE" not in prompts[0]
+    assert "REPAIR STATUTE" in prompts[0]
+    result = state["legal_analysis"]
+    assert result.compliance == ["Deposit cap exceeded"]
+    assert result.risks == ["Novel risk"]
+    assert [f.clause_index for f in result.clause_findings] == [0, 1]
@@ -0,0 +1,138 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# Add src directory to Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+os.environ.setdefault("BLOB_STORE_DIR", tempfile.mkdtemp())
+
+import Orchestrator
+import DocumentAnalyzer
+import Retriever
+import LegalAnalyst
+from BlobStore import get_blob_store
+from State import LegalAnalysisResult
+
+
+@pytest.fixture
+def failures():
+    """Number of times each node should fail before succeeding"""
+    return {}
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch, failures):
+    """Replace the graph nodes with fakes that record each call"""
+    monkeypatch.setenv("CHECKPOINT_DB", str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setenv("BLOB_STORE_DIR", str(tmp_path / "blobs"))
+    Orchestrator.get_rag_app.cache_clear()
+    get_blob_store.cache_clear()
+    calls = []
+
+    def node(name, update):
+        def run(state):
+            calls.append(name)
+            if failures.get(name):
+                failures[name] -= 1
+                raise RuntimeError(f"{name} failed")
+            update(state)
+            return state
+        return run
+
+    def read_document(state):
+        with open(state["document_path"]) as f:
+            state["document_ref"] = get_blob_store().put(f.read())
+
+    monkeypatch.setattr(DocumentAnalyzer, "analyze_document", node("DocumentAnalyzer", read_document))
+    monkeypatch.setattr(Retriever, "retriever", node("Retriever", lambda state: state.update(retrieved_laws=[])))
+    monkeypatch.setattr(LegalAnalyst, "legal_analysis", node("LegalAnalyst", lambda state: state.update(
+        legal_analysis=LegalAnalysisResult(
+            omissions=[], corrections=[], compliance=[], risks=[], recommendations=[],
+            clause_findings=[], executive_summary=get_blob_store().get(state["document_ref"]),
+        )
+    )))
+    yield calls
+    Orchestrator.get_rag_app.cache_clear()
+    get_blob_store.cache_clear()
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "agreement.txt"
+    path.write_text("rental agreement")
+    return str(path)
+
+
+def test_retry_after_document_analyzer_failure_uses_new_inputs(calls, document):
+    with pytest.raises(FileNotFoundError):
+        Orchestrator.run_analysis({"document_path": document + ".deleted", "document_hash": "doc-a"}, "run-1")
+
+    result = Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+
+    assert result["legal_analysis"].executive_summary == "rental agreement"
+    assert calls == ["DocumentAnalyzer", "DocumentAnalyzer", "Retriever", "LegalAnalyst"]
+
+
+def test_retry_resumes_from_last_completed_node(calls, failures, document):
+    failures["LegalAnalyst"] = 1
+    with pytest.raises(RuntimeError):
+        Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+
+    result = Orchestrator.run_analysis({"document_path": document + ".deleted", "document_hash": "doc-a"}, "run-1")
+
+    assert result["legal_analysis"].executive_summary == "rental agreement"
+    assert calls == ["DocumentAnalyzer", "Retriever", "LegalAnalyst", "LegalAnalyst"]
+
+
+def test_completed_run_is_returned_from_checkpoint(calls, document):
+    Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+    result = Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+
+    assert result["legal_analysis"].executive_summary == "rental agreement"
+    assert calls == ["DocumentAnalyzer", "Retriever", "LegalAnalyst"]
+
+
+def test_expired_checkpoint_is_run_again(calls, document, monkeypatch):
+    Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+    monkeypatch.setenv("CHECKPOINT_TTL_SECONDS", "0")
+    Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+
+    assert calls == ["DocumentAnalyzer", "Retriever", "LegalAnalyst"] * 2
+
+
+def test_in_flight_run_is_rejected(calls, document):
+    stream = Orchestrator.stream_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+    with pytest.raises(Orchestrator.RunInProgressError):
+        Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+
+    list(stream)
+    Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+    assert calls == ["DocumentAnalyzer", "Retriever", "LegalAnalyst"]
+
+
+def test_reused_run_id_for_another_document_is_rejected(calls, document):
+    Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+
+    with pytest.raises(Orchestrator.RunIdConflictError):
+        Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-b"}, "run-1")
+    with pytest.raises(Orchestrator.RunIdConflictError):
+        Orchestrator.stream_analysis({"document_path": document, "document_hash": "doc-b"}, "run-1")
+    assert calls == ["DocumentAnalyzer", "Retriever", "LegalAnalyst"]
+
+    # The rejected stream released its claim on the run id
+    Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+
+
+def test_purge_deletes_expired_runs_and_their_blobs(calls, document, monkeypatch):
+    monkeypatch.setenv("BLOB_GC_GRACE_SECONDS", "0")
+    result = Orchestrator.run_analysis({"document_path": document, "document_hash": "doc-a"}, "run-1")
+    blob_path = get_blob_store()._path(result["document_ref"])
+
+    assert Orchestrator.purge_expired_runs() == 0
+    assert os.path.exists(blob_path)
+
+    monkeypatch.setenv("CHECKPOINT_TTL_SECONDS", "0")
+    assert Orchestrator.purge_expired_runs() == 1
+    assert not Orchestrator.get_rag_app().get_state({"configurable": {"thread_id": "run-1"}}).values
+    assert not os.path.exists(blob_path)